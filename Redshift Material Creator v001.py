@@ -1,270 +1,361 @@
 import c4d
+import concurrent.futures
+import functools
 import maxon
 import os
-import re
 import shutil
 from c4d import gui, storage
 
 # --------------------------------------------------
-# Helper: Extract identifier from filename using a given keyword
+# Redshift node space, node and port IDs
 # --------------------------------------------------
-def extract_identifier(file_name, keyword):
-    base = os.path.splitext(file_name)[0]
-    cleaned = base.replace("_", "").lower()
-    keyword_clean = keyword.lower().replace("_", "")
-    pattern = re.compile(r'^(.*)' + re.escape(keyword_clean) + r'(.*)$')
-    match = pattern.match(cleaned)
-    if match:
-        before = match.group(1).strip()
-        after = match.group(2).strip()
-        return after if after else before
-    return None
+RS_NODESPACE_ID  = maxon.Id("com.redshift3d.redshift4c4d.class.nodespace")
+STD_MATERIAL_ID  = maxon.Id("com.redshift3d.redshift4c4d.nodes.core.standardmaterial")
+OUTPUT_ID        = maxon.Id("com.redshift3d.redshift4c4d.node.output")
+TEX_SAMPLER_ID   = maxon.Id("com.redshift3d.redshift4c4d.nodes.core.texturesampler")
+COLOR_CORRECT_ID = maxon.Id("com.redshift3d.redshift4c4d.nodes.core.rscolorcorrection")
+AO_ID            = maxon.Id("com.redshift3d.redshift4c4d.nodes.core.ambientocclusion")
+BUMP_MAP_ID      = maxon.Id("com.redshift3d.redshift4c4d.nodes.core.bumpmap")
+DISPLACEMENT_ID  = maxon.Id("com.redshift3d.redshift4c4d.nodes.core.displacement")
+RAMP_ID          = maxon.Id("com.redshift3d.redshift4c4d.nodes.core.rsramp")
+SPLITTER_ID      = maxon.Id("com.redshift3d.redshift4c4d.nodes.core.rscolorsplitter")
+
+# AddChild only reads its args; one empty dictionary serves every node
+EMPTY_DD = maxon.DataDictionary()
+
+TEX_TEX0            = "com.redshift3d.redshift4c4d.nodes.core.texturesampler.tex0"
+TEX_OUTCOLOR        = "com.redshift3d.redshift4c4d.nodes.core.texturesampler.outcolor"
+CC_INPUT            = "com.redshift3d.redshift4c4d.nodes.core.rscolorcorrection.input"
+CC_OUTCOLOR         = "com.redshift3d.redshift4c4d.nodes.core.rscolorcorrection.outcolor"
+AO_BRIGHT           = "com.redshift3d.redshift4c4d.nodes.core.ambientocclusion.bright"
+AO_OUT              = "com.redshift3d.redshift4c4d.nodes.core.ambientocclusion.out"
+SPLIT_INPUT         = "com.redshift3d.redshift4c4d.nodes.core.rscolorsplitter.input"
+SPLIT_OUTR          = "com.redshift3d.redshift4c4d.nodes.core.rscolorsplitter.outr"
+RAMP_INPUT          = "com.redshift3d.redshift4c4d.nodes.core.rsramp.input"
+RAMP_OUTCOLOR       = "com.redshift3d.redshift4c4d.nodes.core.rsramp.outcolor"
+BUMP_INPUTTYPE      = "com.redshift3d.redshift4c4d.nodes.core.bumpmap.inputtype"
+BUMP_INPUT          = "com.redshift3d.redshift4c4d.nodes.core.bumpmap.input"
+BUMP_OUT            = "com.redshift3d.redshift4c4d.nodes.core.bumpmap.out"
+DISP_TEXMAP         = "com.redshift3d.redshift4c4d.nodes.core.displacement.texmap"
+DISP_OUT            = "com.redshift3d.redshift4c4d.nodes.core.displacement.out"
+STD_BASE_COLOR      = "com.redshift3d.redshift4c4d.nodes.core.standardmaterial.base_color"
+STD_REFL_ROUGHNESS  = "com.redshift3d.redshift4c4d.nodes.core.standardmaterial.refl_roughness"
+STD_BUMP_INPUT      = "com.redshift3d.redshift4c4d.nodes.core.standardmaterial.bump_input"
+STD_OPACITY_COLOR   = "com.redshift3d.redshift4c4d.nodes.core.standardmaterial.opacity_color"
+STD_METALNESS       = "com.redshift3d.redshift4c4d.nodes.core.standardmaterial.metalness"
+OUTPUT_DISPLACEMENT = "com.redshift3d.redshift4c4d.node.output.displacement"
+
+MODEL_EXTENSIONS   = (".fbx", ".obj")
+TEXTURE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".tif", ".tiff", ".exr", ".tx", ".hdr", ".tga", ".bmp", ".webp")
+
+CHANNELS = ("BaseColor", "Roughness", "Normal", "Displacement", "Opacity", "Metalness")
 
 # --------------------------------------------------
-# Helper: Recursively gather all objects under a root
+# Channel wiring: TextureSampler → stages → target port
+# A stage is (node asset id, input port, output port, default port values)
 # --------------------------------------------------
-def get_all_objects(obj):
-    result = []
-    while obj:
-        result.append(obj)
-        result += get_all_objects(obj.GetDown())
-        obj = obj.GetNext()
-    return result
+CC_STAGE    = (COLOR_CORRECT_ID, CC_INPUT,    CC_OUTCOLOR,   ())
+AO_STAGE    = (AO_ID,            AO_BRIGHT,   AO_OUT,        ())
+SPLIT_STAGE = (SPLITTER_ID,      SPLIT_INPUT, SPLIT_OUTR,    ())
+RAMP_STAGE  = (RAMP_ID,          RAMP_INPUT,  RAMP_OUTCOLOR, ())
+BUMP_STAGE  = (BUMP_MAP_ID,      BUMP_INPUT,  BUMP_OUT,      ((BUMP_INPUTTYPE, maxon.Int32(1)),))
+DISP_STAGE  = (DISPLACEMENT_ID,  DISP_TEXMAP, DISP_OUT,      ())
+
+# channel: (stages, target node, target port)
+CHANNEL_WIRING = {
+    "BaseColor":    ((CC_STAGE,),   "std",    STD_BASE_COLOR),
+    "Roughness":    ((RAMP_STAGE,), "std",    STD_REFL_ROUGHNESS),
+    "Normal":       ((BUMP_STAGE,), "std",    STD_BUMP_INPUT),
+    "Displacement": ((DISP_STAGE,), "output", OUTPUT_DISPLACEMENT),
+    "Opacity":      ((),            "std",    STD_OPACITY_COLOR),
+    "Metalness":    ((),            "std",    STD_METALNESS),
+}
+# Game assets pack these maps into the red channel
+GAME_ASSET_SPLIT_CHANNELS = ("Roughness", "Opacity")
+
+# A file normally belongs to one channel (the one whose keyword comes last in its
+# name); enable to let packed maps feed every channel they match
+MULTICHANNEL_MATCH = False
+
+# Copy Textures makes real copies; enable to hardlink instead where possible.
+# A hardlinked texture IS the source file: editing it in tex/ edits the library.
+LINK_COPIES = False
+
+# --------------------------------------------------
+# Material set: texture path (or None) per channel plus material options
+# --------------------------------------------------
+class MaterialSet:
+    __slots__ = CHANNELS + ("materialName", "ao", "gameAsset")
+
+    def __init__(self, materialName="RS Material", ao=False, gameAsset=False, **paths):
+        self.materialName = materialName
+        self.ao           = ao
+        self.gameAsset    = gameAsset
+        for ch in CHANNELS:
+            setattr(self, ch, paths.pop(ch, None))
+        if paths:
+            raise TypeError(f"Unknown channels: {', '.join(paths)}")
+
+# --------------------------------------------------
+# Helper: Extract identifier from a normalized stem using a normalized keyword
+# --------------------------------------------------
+def extract_identifier(stem, keyword):
+    # Last occurrence, matching the old greedy ^(.*)keyword(.*)$ regex
+    i = stem.rfind(keyword)
+    if i < 0:
+        return None
+    after = stem[i + len(keyword):].strip()
+    return after if after else stem[:i].strip()
+
+# --------------------------------------------------
+# Helper: Normalize a channel's comma-separated keywords, in list order
+# --------------------------------------------------
+@functools.lru_cache(maxsize=None)
+def channel_keywords(text):
+    # Empty keywords (e.g. a trailing comma) would match every file
+    return tuple(k for k in (kw.strip().lower().replace("_", "") for kw in text.split(",")) if k)
+
+# --------------------------------------------------
+# Helper: Scan a folder once; returns (path, normalized stem) texture entries
+# plus the 3D model files found alongside the textures
+# --------------------------------------------------
+def scan_folder(folder):
+    entries = []
+    model_files = []
+    # Normalized once here so every entry.path is already clean
+    with os.scandir(os.path.normpath(folder)) as it:
+        for entry in it:
+            if not entry.is_file():
+                continue
+            low = entry.name.lower()
+            if low.endswith(MODEL_EXTENSIONS):
+                model_files.append(entry.path)
+                continue
+            if not low.endswith(TEXTURE_EXTENSIONS):
+                continue
+            # Stem only, so keywords never match the extension
+            entries.append((entry.path, os.path.splitext(low)[0].replace("_", "")))
+    return entries, model_files
+
+# --------------------------------------------------
+# Helper: Copy a file; with LINK_COPIES, hardlink when both share a volume
+# --------------------------------------------------
+def fast_copy(src, dst):
+    if LINK_COPIES:
+        try:
+            os.link(src, dst)
+            return
+        except OSError:
+            # Different volume, existing target or no link support
+            pass
+    shutil.copy2(src, dst)
+
+# --------------------------------------------------
+# Helper: Copy files into a folder in parallel; returns {source: path to use}
+# --------------------------------------------------
+def copy_textures(paths, folder):
+    def copy(src):
+        dst = os.path.join(folder, os.path.basename(src))
+        try:
+            # Re-runs: an existing copy with the same size and mtime is kept as is
+            s, d = os.stat(src), os.stat(dst)
+            if s.st_size == d.st_size and int(s.st_mtime) == int(d.st_mtime):
+                return dst
+        except OSError:
+            pass
+        try:
+            fast_copy(src, dst)
+            return dst
+        except Exception as e:
+            print("Error copying file:", e)
+            return src
+
+    # I/O bound: the copies overlap while each thread waits on the disk
+    with concurrent.futures.ThreadPoolExecutor(max_workers=min(8, len(paths) or 1)) as ex:
+        return dict(zip(paths, ex.map(copy, paths)))
+
+# --------------------------------------------------
+# Helper: Iterate all objects under a root (iterative, no recursion limit)
+# --------------------------------------------------
+def iter_objects(obj):
+    stack = [obj]
+    while stack:
+        node = stack.pop()
+        while node:
+            yield node
+            child = node.GetDown()
+            if child:
+                stack.append(child)
+            node = node.GetNext()
+
+# --------------------------------------------------
+# Helper: Find the first node of each asset id in a single graph walk
+# --------------------------------------------------
+def find_nodes(graph, *asset_ids):
+    wanted = {str(aid): i for i, aid in enumerate(asset_ids)}
+    found = [None] * len(asset_ids)
+    remaining = len(asset_ids)
+    for node in graph.GetRoot().GetInnerNodes(maxon.NODE_KIND.NODE, False):
+        i = wanted.pop(str(node.GetValue("net.maxon.node.attribute.assetid")[0]), None)
+        if i is not None:
+            found[i] = node
+            remaining -= 1
+            if not remaining:
+                break
+    return found
 
 # --------------------------------------------------
 # Material Creation Function (with Game Asset ColorSplitters)
 # --------------------------------------------------
-def create_redshift_material(file_paths):
-    doc = c4d.documents.GetActiveDocument()
-    if not doc:
+def create_redshift_material(doc, file_paths):
+    # Nothing to wire; don't create an empty material
+    if not any(getattr(file_paths, ch) for ch in CHANNELS):
         return None
 
-    c4d.CallCommand(1040254, 1012)  # Redshift Material Presets
-    mat = doc.GetActiveMaterial()
+    # A bare material plus the Redshift default graph (StandardMaterial -> Output);
+    # no preset command, and nothing is inserted until the nodes are committed
+    mat = c4d.BaseMaterial(c4d.Mmaterial)
     if not mat:
         return None
-    mat.SetName(file_paths.get("materialName", "RS Material"))
+    mat.SetName(file_paths.materialName)
 
     node_material = mat.GetNodeMaterialReference()
     if node_material is None:
         return None
 
-    graph = node_material.CreateDefaultGraph(
-        maxon.Id("com.redshift3d.redshift4c4d.class.nodespace")
-    )
+    graph = node_material.CreateDefaultGraph(RS_NODESPACE_ID)
     if graph is None or graph.IsNullValue():
         return None
 
-    # Find StandardMaterial and Output nodes
-    std_nodes = []
-    maxon.GraphModelHelper.FindNodesByAssetId(
-        graph,
-        maxon.Id("com.redshift3d.redshift4c4d.nodes.core.standardmaterial"),
-        True, std_nodes
-    )
-    if not std_nodes:
+    # Find StandardMaterial and Output nodes in one walk
+    std_node, output_node = find_nodes(graph, STD_MATERIAL_ID, OUTPUT_ID)
+    if std_node is None or output_node is None:
         return None
-    std_node = std_nodes[0]
 
-    output_nodes = []
-    maxon.GraphModelHelper.FindNodesByAssetId(
-        graph,
-        maxon.Id("com.redshift3d.redshift4c4d.node.output"),
-        True, output_nodes
-    )
-    if not output_nodes:
+    # Declarative plan: (channel, url, stages, target port) per channel with a texture
+    std_inputs = std_node.GetInputs()
+    out_inputs = output_node.GetInputs()
+    plan = []
+    for ch in CHANNELS:
+        path = getattr(file_paths, ch)
+        if not path:
+            continue
+        stages, target_node, target_port = CHANNEL_WIRING[ch]
+        if file_paths.gameAsset and ch in GAME_ASSET_SPLIT_CHANNELS:
+            stages = (SPLIT_STAGE,) + stages
+        if file_paths.ao and ch == "BaseColor":
+            stages = stages + (AO_STAGE,)
+        # Resolve the target up front; a channel without one is dropped, not rolled back
+        target = (std_inputs if target_node == "std" else out_inputs).FindChild(target_port)
+        if not target:
+            print(f"Skipping {ch}: port {target_port} not found")
+            continue
+        plan.append((ch, maxon.Url(path), stages, target))
+
+    with graph.BeginTransaction() as tr:
+        try:
+            # 1) Add all nodes first
+            # Samplers get a fixed id so clones can find their channel again
+            nodes = [
+                (graph.AddChild(sampler_node_id(ch), TEX_SAMPLER_ID, EMPTY_DD),
+                 [graph.AddChild("", stage[0], EMPTY_DD) for stage in stages])
+                for ch, url, stages, target in plan
+            ]
+
+            # Port lists are fetched once per node and shared by both passes below
+            ports = [
+                ((tn.GetInputs(), tn.GetOutputs()),
+                 [(node.GetInputs(), node.GetOutputs()) for node in stage_nodes])
+                for tn, stage_nodes in nodes
+            ]
+
+            # 2) Default values: RAW colorspace + path on every sampler, stage defaults
+            for (ch, url, stages, target), ((tn_in, tn_out), stage_ports) in zip(plan, ports):
+                inp = tn_in.FindChild(TEX_TEX0)
+                if inp:
+                    cs = inp.FindChild("colorspace")
+                    cs and cs.SetDefaultValue("RS_INPUT_COLORSPACE_RAW")
+                    p = inp.FindChild("path")
+                    p and p.SetDefaultValue(url)
+                for (ins, outs), stage in zip(stage_ports, stages):
+                    for port_name, value in stage[3]:
+                        port = ins.FindChild(port_name)
+                        port and port.SetDefaultValue(value)
+
+            # 3) Connections: sampler.outcolor → stage → ... → target
+            for (ch, url, stages, target), ((tn_in, tn_out), stage_ports) in zip(plan, ports):
+                out = tn_out.FindChild(TEX_OUTCOLOR)
+                for (ins, outs), stage in zip(stage_ports, stages):
+                    inp = ins.FindChild(stage[1])
+                    out and inp and out.Connect(inp)
+                    out = outs.FindChild(stage[2])
+                out and out.Connect(target)
+
+            tr.Commit()
+        except Exception as e:
+            tr.Rollback()
+            print(f"Error creating nodes: {e}")
+            return None
+
+    doc.InsertMaterial(mat)
+    doc.AddUndo(c4d.UNDOTYPE_NEWOBJ, mat)
+    return mat
+
+# --------------------------------------------------
+# Helper: Node id of the TextureSampler for a channel
+# --------------------------------------------------
+def sampler_node_id(channel):
+    return maxon.Id("tex_" + channel)
+
+# --------------------------------------------------
+# Helper: Key of the node topology a material set produces
+# --------------------------------------------------
+def material_topology(file_paths):
+    return (tuple(bool(getattr(file_paths, ch)) for ch in CHANNELS),
+            bool(file_paths.ao), bool(file_paths.gameAsset))
+
+# --------------------------------------------------
+# Clone a material with the same topology and rebind its texture paths
+# --------------------------------------------------
+def clone_redshift_material(doc, prototype, file_paths):
+    mat = prototype.GetClone(c4d.COPYFLAGS_NONE)
+    if not mat:
         return None
-    output_node = output_nodes[0]
+    mat.SetName(file_paths.materialName)
 
-    # Node IDs
-    texture_sampler_id = maxon.Id("com.redshift3d.redshift4c4d.nodes.core.texturesampler")
-    color_correct_id   = maxon.Id("com.redshift3d.redshift4c4d.nodes.core.rscolorcorrection")
-    bump_map_id        = maxon.Id("com.redshift3d.redshift4c4d.nodes.core.bumpmap")
-    displacement_id    = maxon.Id("com.redshift3d.redshift4c4d.nodes.core.displacement")
-    ramp_id            = maxon.Id("com.redshift3d.redshift4c4d.nodes.core.rsramp")
-    split_id           = maxon.Id("com.redshift3d.redshift4c4d.nodes.core.rscolorsplitter")
+    # Only inserted once every sampler is rebound; a clone still holding any of the
+    # prototype's files is dropped and the caller builds the material from scratch
+    graph = mat.GetNodeMaterialReference().GetGraph(RS_NODESPACE_ID)
+    if graph is None or graph.IsNullValue():
+        return None
 
-    channels    = ["BaseColor", "Roughness", "Normal", "Displacement", "Opacity", "Metalness"]
-    game_asset  = file_paths.get("gameAsset", False)
-    texture_nodes = {}
+    samplers = []
+    maxon.GraphModelHelper.FindNodesByAssetId(graph, TEX_SAMPLER_ID, True, samplers)
+    urls = {str(sampler_node_id(ch)): maxon.Url(getattr(file_paths, ch))
+            for ch in CHANNELS if getattr(file_paths, ch)}
 
     with graph.BeginTransaction() as tr:
         try:
-            # 1) Create TextureSampler nodes and set all to RAW colorspace
-            for ch in channels:
-                path = file_paths.get(ch)
-                if path:
-                    tn = graph.AddChild("", texture_sampler_id, maxon.DataDictionary())
-                    texture_nodes[ch] = tn
-                    inp = tn.GetInputs().FindChild(
-                        "com.redshift3d.redshift4c4d.nodes.core.texturesampler.tex0"
-                    )
-                    if inp:
-                        # Set RAW colorspace for every map
-                        cs = inp.FindChild("colorspace")
-                        cs and cs.SetDefaultValue("RS_INPUT_COLORSPACE_RAW")
-                        p = inp.FindChild("path")
-                        p and p.SetDefaultValue(maxon.Url(path))
-                else:
-                    texture_nodes[ch] = None
-
-            # 2) BaseColor → ColorCorrection → (AO?) → standard.base_color
-            if texture_nodes["BaseColor"]:
-                cc = graph.AddChild("", color_correct_id, maxon.DataDictionary())
-                outc = texture_nodes["BaseColor"].GetOutputs().FindChild(
-                    "com.redshift3d.redshift4c4d.nodes.core.texturesampler.outcolor"
-                )
-                inc = cc.GetInputs().FindChild(
-                    "com.redshift3d.redshift4c4d.nodes.core.rscolorcorrection.input"
-                )
-                outc and inc and outc.Connect(inc)
-                outcc = cc.GetOutputs().FindChild(
-                    "com.redshift3d.redshift4c4d.nodes.core.rscolorcorrection.outcolor"
-                )
-                base_in = std_node.GetInputs().FindChild(
-                    "com.redshift3d.redshift4c4d.nodes.core.standardmaterial.base_color"
-                )
-                if file_paths.get("ao") and outcc and base_in:
-                    ao = graph.AddChild(
-                        "", maxon.Id("com.redshift3d.redshift4c4d.nodes.core.ambientocclusion"),
-                        maxon.DataDictionary()
-                    )
-                    ao_in = ao.GetInputs().FindChild(
-                        "com.redshift3d.redshift4c4d.nodes.core.ambientocclusion.bright"
-                    )
-                    ao_out = ao.GetOutputs().FindChild(
-                        "com.redshift3d.redshift4c4d.nodes.core.ambientocclusion.out"
-                    )
-                    outcc.Connect(ao_in)
-                    ao_out.Connect(base_in)
-                elif outcc and base_in:
-                    outcc.Connect(base_in)
-
-            # 3) Roughness → [Splitter?] → Ramp → standard.refl_roughness
-            if texture_nodes["Roughness"]:
-                if game_asset:
-                    sp_r = graph.AddChild("", split_id, maxon.DataDictionary())
-                    rout = texture_nodes["Roughness"].GetOutputs().FindChild(
-                        "com.redshift3d.redshift4c4d.nodes.core.texturesampler.outcolor"
-                    )
-                    rin = sp_r.GetInputs().FindChild(
-                        "com.redshift3d.redshift4c4d.nodes.core.rscolorsplitter.input"
-                    )
-                    rout and rin and rout.Connect(rin)
-                    rout_out = sp_r.GetOutputs().FindChild(
-                        "com.redshift3d.redshift4c4d.nodes.core.rscolorsplitter.outr"
-                    )
-                    ramp = graph.AddChild("", ramp_id, maxon.DataDictionary())
-                    ramp_in = ramp.GetInputs().FindChild(
-                        "com.redshift3d.redshift4c4d.nodes.core.rsramp.input"
-                    )
-                    rout_out and ramp_in and rout_out.Connect(ramp_in)
-                    ramp_out = ramp.GetOutputs().FindChild(
-                        "com.redshift3d.redshift4c4d.nodes.core.rsramp.outcolor"
-                    )
-                    rough_in = std_node.GetInputs().FindChild(
-                        "com.redshift3d.redshift4c4d.nodes.core.standardmaterial.refl_roughness"
-                    )
-                    ramp_out and rough_in and ramp_out.Connect(rough_in)
-                else:
-                    ramp = graph.AddChild("", ramp_id, maxon.DataDictionary())
-                    rout = texture_nodes["Roughness"].GetOutputs().FindChild(
-                        "com.redshift3d.redshift4c4d.nodes.core.texturesampler.outcolor"
-                    )
-                    ramp_in = ramp.GetInputs().FindChild(
-                        "com.redshift3d.redshift4c4d.nodes.core.rsramp.input"
-                    )
-                    rout and ramp_in and rout.Connect(ramp_in)
-                    ramp_out = ramp.GetOutputs().FindChild(
-                        "com.redshift3d.redshift4c4d.nodes.core.rsramp.outcolor"
-                    )
-                    rough_in = std_node.GetInputs().FindChild(
-                        "com.redshift3d.redshift4c4d.nodes.core.standardmaterial.refl_roughness"
-                    )
-                    ramp_out and rough_in and ramp_out.Connect(rough_in)
-
-            # 4) Normal → Bump → standard.bump_input
-            if texture_nodes["Normal"]:
-                bm = graph.AddChild("", bump_map_id, maxon.DataDictionary())
-                bm.GetInputs().FindChild(
-                    "com.redshift3d.redshift4c4d.nodes.core.bumpmap.inputtype"
-                ).SetDefaultValue(maxon.Int32(1))
-                n_out = texture_nodes["Normal"].GetOutputs().FindChild(
-                    "com.redshift3d.redshift4c4d.nodes.core.texturesampler.outcolor"
-                )
-                n_inp = bm.GetInputs().FindChild(
-                    "com.redshift3d.redshift4c4d.nodes.core.bumpmap.input"
-                )
-                n_out and n_inp and n_out.Connect(n_inp)
-                n_out2 = bm.GetOutputs().FindChild(
-                    "com.redshift3d.redshift4c4d.nodes.core.bumpmap.out"
-                )
-                bump_std = std_node.GetInputs().FindChild(
-                    "com.redshift3d.redshift4c4d.nodes.core.standardmaterial.bump_input"
-                )
-                n_out2 and bump_std and n_out2.Connect(bump_std)
-
-            # 5) Displacement → output.displacement
-            if texture_nodes["Displacement"]:
-                dp = graph.AddChild("", displacement_id, maxon.DataDictionary())
-                d_out = texture_nodes["Displacement"].GetOutputs().FindChild(
-                    "com.redshift3d.redshift4c4d.nodes.core.texturesampler.outcolor"
-                )
-                d_inp = dp.GetInputs().FindChild(
-                    "com.redshift3d.redshift4c4d.nodes.core.displacement.texmap"
-                )
-                d_out and d_inp and d_out.Connect(d_inp)
-                d_out2 = dp.GetOutputs().FindChild(
-                    "com.redshift3d.redshift4c4d.nodes.core.displacement.out"
-                )
-                od = output_node.GetInputs().FindChild(
-                    "com.redshift3d.redshift4c4d.node.output.displacement"
-                )
-                d_out2 and od and d_out2.Connect(od)
-
-            # 6) Opacity → [Splitter?] → standard.opacity_color
-            if texture_nodes["Opacity"]:
-                if game_asset:
-                    sp_o = graph.AddChild("", split_id, maxon.DataDictionary())
-                    o_out = texture_nodes["Opacity"].GetOutputs().FindChild(
-                        "com.redshift3d.redshift4c4d.nodes.core.texturesampler.outcolor"
-                    )
-                    o_inp = sp_o.GetInputs().FindChild(
-                        "com.redshift3d.redshift4c4d.nodes.core.rscolorsplitter.input"
-                    )
-                    o_out and o_inp and o_out.Connect(o_inp)
-                    o_r = sp_o.GetOutputs().FindChild(
-                        "com.redshift3d.redshift4c4d.nodes.core.rscolorsplitter.outr"
-                    )
-                    std_o = std_node.GetInputs().FindChild(
-                        "com.redshift3d.redshift4c4d.nodes.core.standardmaterial.opacity_color"
-                    )
-                    o_r and std_o and o_r.Connect(std_o)
-                else:
-                    o_out = texture_nodes["Opacity"].GetOutputs().FindChild(
-                        "com.redshift3d.redshift4c4d.nodes.core.texturesampler.outcolor"
-                    )
-                    std_o = std_node.GetInputs().FindChild(
-                        "com.redshift3d.redshift4c4d.nodes.core.standardmaterial.opacity_color"
-                    )
-                    o_out and std_o and o_out.Connect(std_o)
-
-            # 7) Metalness → standard.metalness
-            if texture_nodes["Metalness"]:
-                m_out = texture_nodes["Metalness"].GetOutputs().FindChild(
-                    "com.redshift3d.redshift4c4d.nodes.core.texturesampler.outcolor"
-                )
-                m_inp = std_node.GetInputs().FindChild(
-                    "com.redshift3d.redshift4c4d.nodes.core.standardmaterial.metalness"
-                )
-                m_out and m_inp and m_out.Connect(m_inp)
-
+            rebound = 0
+            for tn in samplers:
+                url = urls.get(str(tn.GetId()))
+                if url is None:
+                    continue
+                inp = tn.GetInputs().FindChild(TEX_TEX0)
+                p = inp and inp.FindChild("path")
+                if p:
+                    p.SetDefaultValue(url)
+                    rebound += 1
+            if rebound != len(urls):
+                raise RuntimeError(f"{rebound} of {len(urls)} samplers found")
             tr.Commit()
         except Exception as e:
             tr.Rollback()
-            print(f"Error creating nodes: {e}")
+            print(f"Error rebinding textures: {e}")
+            return None
 
-    c4d.EventAdd()
+    doc.InsertMaterial(mat)
+    doc.AddUndo(c4d.UNDOTYPE_NEWOBJ, mat)
     return mat
 
 # --------------------------------------------------
@@ -297,6 +388,15 @@ class MyDialog(gui.GeDialog):
         "Normal":       3004,
         "Displacement": 3005
     }
+    # (channel, default keywords, checked); gadget ids come from the dicts above
+    INIT_ROWS = (
+        ("BaseColor",    "BaseColor, Albedo",    True),
+        ("Metalness",    "Metalness, Mtl",       False),
+        ("Roughness",    "Roughness, Rough",     True),
+        ("Opacity",      "Opacity, Alpha",       False),
+        ("Normal",       "Normal, Nrm",          True),
+        ("Displacement", "Displacement, Height", True),
+    )
 
     def CreateLayout(self):
         self.SetTitle("Redshift Material Creator")
@@ -314,10 +414,8 @@ class MyDialog(gui.GeDialog):
         self.GroupEnd()
 
         # Texture Channels
-        channels = list(self.CHECKBOX_IDS.keys())
-        self.GroupBegin(5000, c4d.BFH_SCALEFIT, 1, len(channels)*2)
-        for ch in channels:
-            cb = self.CHECKBOX_IDS[ch]
+        self.GroupBegin(5000, c4d.BFH_SCALEFIT, 1, len(self.CHECKBOX_IDS)*2)
+        for ch, cb in self.CHECKBOX_IDS.items():
             tb = self.TEXTBOX_IDS[ch]
             self.GroupBegin(6000+cb, c4d.BFH_SCALEFIT, 2, 1)
             self.AddCheckbox(cb, c4d.BFH_LEFT, 20, 15, ch)
@@ -344,19 +442,9 @@ class MyDialog(gui.GeDialog):
     def InitValues(self):
         self.SetString(self.FOLDER_INPUT, "")
         self.SetString(self.MATERIAL_NAME_INPUT, "RS Material")
-        default_texts = {
-            "BaseColor":    "BaseColor, Albedo",
-            "Roughness":    "Roughness, Rough",
-            "Normal":       "Normal, Nrm",
-            "Displacement": "Displacement, Height",
-            "Opacity":      "Opacity, Alpha",
-            "Metalness":    "Metalness, Mtl"
-        }
-        for ch, cb in self.CHECKBOX_IDS.items():
-            default_state = False if ch in ("Opacity", "Metalness") else True
-            self.SetBool(cb, default_state)
-            self.SetString(self.TEXTBOX_IDS[ch], default_texts[ch])
-            self.Enable(self.TEXTBOX_IDS[ch], True)
+        for ch, text, checked in self.INIT_ROWS:
+            self.SetBool(self.CHECKBOX_IDS[ch], checked)
+            self.SetString(self.TEXTBOX_IDS[ch], text)
 
         self.SetBool(self.IMPORT_3D_MODEL_CHECKBOX, False)
         self.SetBool(self.AO_CHECKBOX,              False)
@@ -364,102 +452,116 @@ class MyDialog(gui.GeDialog):
         self.SetBool(self.GAME_ASSET_CHECKBOX,      False)
 
         self.result = None
+        self._scan_cache = None
         return True
 
+    def find_channel_files(self, folder):
+        channel_files = {ch: {} for ch in self.CHECKBOX_IDS}
+        enabled = [ch for ch, cb in self.CHECKBOX_IDS.items() if self.GetBool(cb)]
+        if not enabled:
+            return channel_files, []
+
+        # Preview followed by Create scans the same folder; reuse the result while
+        # the channel settings and the folder listing (directory mtime) are unchanged
+        keywords = [self.GetString(self.TEXTBOX_IDS[ch]) for ch in enabled]
+        key = (os.path.normpath(folder), os.stat(folder).st_mtime_ns, tuple(zip(enabled, keywords)))
+        if self._scan_cache and self._scan_cache[0] == key:
+            return self._scan_cache[1]
+
+        # Per channel: its file map, keywords and every identifier its keywords hit
+        searches = []
+        for ch, text in zip(enabled, keywords):
+            kws = channel_keywords(text)
+            if kws:
+                searches.append((ch, kws, set()))
+
+        entries, model_files = scan_folder(folder)
+        for path, stem in entries:
+            best = None
+            for ch, kws, hits in searches:
+                # First keyword in list order wins, not the first one in the name
+                kw = next((k for k in kws if k in stem), None)
+                if kw is None:
+                    continue
+                ident = extract_identifier(stem, kw) or ""
+                hits.add(ident)
+                if MULTICHANNEL_MATCH:
+                    channel_files[ch][ident] = path
+                    continue
+                # One channel per file: the one whose keyword comes last in the name,
+                # so "RoughConcrete_Normal" is a Normal map, not a Roughness map
+                pos = stem.rfind(kw)
+                if best is None or pos > best[0]:
+                    best = (pos, ch, ident)
+            if best is not None:
+                pos, ch, ident = best
+                channel_files[ch][ident] = path
+
+        # A channel whose keywords hit a single identifier feeds every set. Count all
+        # hits, not just the files the channel kept: "RoughStone_Normal" still matches
+        # Roughness, so a lone "Wood_Roughness" stays on the wood material
+        for ch, kws, hits in searches:
+            files = channel_files[ch]
+            if len(files) == 1 and len(hits) == 1:
+                (path,) = files.values()
+                channel_files[ch] = {"": path}
+        self._scan_cache = (key, (channel_files, model_files))
+        return channel_files, model_files
+
+    def build_material_sets(self, folder):
+        channel_files, model_files = self.find_channel_files(folder)
+
+        # One set per identifier found in any channel, built in a single pass;
+        # disabled channels already have empty file maps
+        materialSets = {}
+        base       = self.GetString(self.MATERIAL_NAME_INPUT).strip()
+        ao         = self.GetBool(self.AO_CHECKBOX)
+        game_asset = self.GetBool(self.GAME_ASSET_CHECKBOX)
+        for ident in set().union(*channel_files.values()):
+            materialSets[ident] = MaterialSet(
+                materialName=f"{base}_{ident}" if ident else base,
+                ao=ao, gameAsset=game_asset,
+                **{ch: files.get(ident) for ch, files in channel_files.items()})
+        return materialSets, model_files
+
     def Command(self, id, msg):
         if id == self.SELECT_FOLDER_BUTTON:
             folder = storage.LoadDialog(title="Select a Folder", flags=c4d.FILESELECT_DIRECTORY)
             if folder:
                 self.SetString(self.FOLDER_INPUT, folder)
 
-        if id == self.PREVIEW_MATERIAL_BUTTON:
+        if id in (self.PREVIEW_MATERIAL_BUTTON, self.CREATE_MATERIAL_BUTTON):
             folder = self.GetString(self.FOLDER_INPUT).strip()
             if not folder or not os.path.exists(folder):
                 gui.MessageDialog("Please select a valid folder.")
                 return True
 
-            channels = list(self.CHECKBOX_IDS.keys())
-            channel_files = {ch: {} for ch in channels}
-            for fn in os.listdir(folder):
-                low = fn.lower().replace("_", "")
-                for ch in channels:
-                    if self.GetBool(self.CHECKBOX_IDS[ch]):
-                        kws = [k.strip() for k in self.GetString(self.TEXTBOX_IDS[ch]).split(',')]
-                        for kw in kws:
-                            if kw.lower().replace("_", "") in low:
-                                ident = extract_identifier(fn, kw) or ""
-                                channel_files[ch][ident] = os.path.join(folder, fn)
-                                break
-
-            for ch in channels:
-                if len(channel_files[ch]) == 1:
-                    val = next(iter(channel_files[ch].values()))
-                    channel_files[ch] = {"": val}
-
-            ids = set().union(*[set(channel_files[ch].keys()) for ch in channels])
-            if not ids:
+            materialSets, model_files = self.build_material_sets(folder)
+            if not materialSets:
                 gui.MessageDialog("No texture files found.")
                 return True
 
-            preview = ""
-            base = self.GetString(self.MATERIAL_NAME_INPUT).strip()
-            for ident in ids:
-                name = f"{base}_{ident}" if ident else base
-                preview += f"Material: {name}\n"
-                for ch in channels:
-                    if channel_files[ch].get(ident):
-                        preview += f"  {ch}: {os.path.basename(channel_files[ch][ident])}\n"
-                preview += "\n"
-
-            gui.MessageDialog(preview)
-
-        if id == self.CREATE_MATERIAL_BUTTON:
-            folder = self.GetString(self.FOLDER_INPUT).strip()
-            if not folder or not os.path.exists(folder):
-                gui.MessageDialog("Please select a valid folder.")
-                return True
-
-            channels = list(self.CHECKBOX_IDS.keys())
-            channel_files = {ch: {} for ch in channels}
-            for fn in os.listdir(folder):
-                low = fn.lower().replace("_", "")
-                for ch in channels:
-                    if self.GetBool(self.CHECKBOX_IDS[ch]):
-                        kws = [k.strip() for k in self.GetString(self.TEXTBOX_IDS[ch]).split(',')]
-                        for kw in kws:
-                            if kw.lower().replace("_", "") in low:
-                                ident = extract_identifier(fn, kw) or ""
-                                channel_files[ch][ident] = os.path.join(folder, fn)
-                                break
-
-            for ch in channels:
-                if len(channel_files[ch]) == 1:
-                    val = next(iter(channel_files[ch].values()))
-                    channel_files[ch] = {"": val}
-
-            ids = set().union(*[set(channel_files[ch].keys()) for ch in channels])
-            if not ids:
-                gui.MessageDialog("No texture files found.")
-                return True
-
-            materialSets = {}
-            base = self.GetString(self.MATERIAL_NAME_INPUT).strip()
-            for ident in ids:
-                ms = {ch: channel_files[ch].get(ident) if self.GetBool(self.CHECKBOX_IDS[ch]) else None
-                      for ch in channels}
-                ms["materialName"] = f"{base}_{ident}" if ident else base
-                ms["ao"]           = self.GetBool(self.AO_CHECKBOX)
-                ms["gameAsset"]    = self.GetBool(self.GAME_ASSET_CHECKBOX)
-                materialSets[ident] = ms
-
-            self.result = {
-                "materialSets": materialSets,
-                "folder":       folder,
-                "importObject": self.GetBool(self.IMPORT_3D_MODEL_CHECKBOX),
-                "copyTextures": self.GetBool(self.COPY_TEXTURES_CHECKBOX),
-                "gameAsset":    self.GetBool(self.GAME_ASSET_CHECKBOX),
-            }
-            self.Close()
+            if id == self.PREVIEW_MATERIAL_BUTTON:
+                lines = []
+                for ms in materialSets.values():
+                    lines.append(f"Material: {ms.materialName}")
+                    for ch in self.CHECKBOX_IDS:
+                        path = getattr(ms, ch)
+                        if path:
+                            lines.append(f"  {ch}: {os.path.basename(path)}")
+                    lines.append("")
+
+                gui.MessageDialog("\n".join(lines) + "\n")
+            else:
+                self.result = {
+                    "materialSets": materialSets,
+                    "folder":       folder,
+                    "importObject": self.GetBool(self.IMPORT_3D_MODEL_CHECKBOX),
+                    "copyTextures": self.GetBool(self.COPY_TEXTURES_CHECKBOX),
+                    "gameAsset":    self.GetBool(self.GAME_ASSET_CHECKBOX),
+                    "modelFiles":   model_files,
+                }
+                self.Close()
 
         return True
 
@@ -481,42 +583,75 @@ def main():
         tex_folder = os.path.join(project_folder, "tex")
         if not os.path.exists(tex_folder):
             os.makedirs(tex_folder)
-        for ident, ms in file_paths["materialSets"].items():
-            for ch in ["BaseColor", "Roughness", "Normal", "Displacement", "Opacity", "Metalness"]:
-                path = ms.get(ch)
+        # Textures shared by several sets are copied once
+        sets = file_paths["materialSets"].values()
+        paths = list(dict.fromkeys(filter(None, (getattr(ms, ch) for ms in sets for ch in CHANNELS))))
+        copied = copy_textures(paths, tex_folder)
+        for ms in sets:
+            for ch in CHANNELS:
+                path = getattr(ms, ch)
                 if path:
-                    dst = os.path.join(tex_folder, os.path.basename(path))
-                    try:
-                        shutil.copy2(path, dst)
-                        ms[ch] = dst
-                    except Exception as e:
-                        print("Error copying file:", e)
-
-    # Create materials
-    created_materials = {}
-    for ident, ms in file_paths["materialSets"].items():
-        ms["gameAsset"] = file_paths.get("gameAsset", False)
-        mat = create_redshift_material(ms)
-        if mat:
-            created_materials[ident] = mat
-
-    # Import models and assign materials
-    if file_paths.get("importObject"):
-        folder = file_paths["folder"]
-        old_objs = get_all_objects(doc.GetFirstObject()) if doc.GetFirstObject() else []
-        for fn in os.listdir(folder):
-            if fn.lower().endswith(('.fbx', '.obj')):
-                c4d.documents.MergeDocument(
-                    doc, os.path.join(folder, fn), c4d.SCENEFILTER_OBJECTS
-                )
-
-        new_objs = get_all_objects(doc.GetFirstObject()) if doc.GetFirstObject() else []
-        added = [o for o in new_objs if o not in old_objs]
-        for obj in added:
+                    setattr(ms, ch, copied[path])
+
+    # One undo step for the whole batch: materials, imported models and tags
+    doc.StartUndo()
+
+    try:
+        # Create materials
+        # Build each node topology once; sets sharing it clone that material
+        created_materials = {}
+        prototypes = {}
+        for ident, ms in file_paths["materialSets"].items():
+            if not any(getattr(ms, ch) for ch in CHANNELS):
+                continue
+            ms.gameAsset = file_paths.get("gameAsset", False)
+            key = material_topology(ms)
+            if key in prototypes:
+                # A clone that could not be rebound is built from scratch instead
+                mat = (clone_redshift_material(doc, prototypes[key], ms)
+                       or create_redshift_material(doc, ms))
+            else:
+                mat = create_redshift_material(doc, ms)
+                if mat:
+                    prototypes[key] = mat
+            if mat:
+                created_materials[ident] = mat
+
+        # Import models and assign materials
+        if file_paths.get("importObject"):
+            # Load every model into a scratch document, then move the roots over in one go
+            tmp_doc = c4d.documents.BaseDocument()
+            for path in file_paths["modelFiles"]:
+                c4d.documents.MergeDocument(tmp_doc, path, c4d.SCENEFILTER_OBJECTS)
+            roots = []
+            obj = tmp_doc.GetFirstObject()
+            while obj:
+                roots.append(obj)
+                obj = obj.GetNext()
+
+            pred = None
+            for root in roots:
+                root.Remove()
+                doc.InsertObject(root, None, pred)
+                doc.AddUndo(c4d.UNDOTYPE_NEWOBJ, root)
+                pred = root
+
+            # Only meshes need a tag; null groups just pass tags down the hierarchy.
+            # Tags ride on the roots' undo step since every tagged object is new.
+            added = [o for root in roots for o in (root, *iter_objects(root.GetDown()))
+                     if o.CheckType(c4d.Opolygon)]
+            # One configured tag per material, cloned onto each object
+            templates = []
             for mat in created_materials.values():
                 tag = c4d.BaseTag(c4d.Ttexture)
                 tag[c4d.TEXTURETAG_MATERIAL] = mat
-                obj.InsertTag(tag)
+                templates.append(tag)
+            for obj in added:
+                for tag in templates:
+                    obj.InsertTag(tag.GetClone(c4d.COPYFLAGS_NONE))
+    finally:
+        # Close the undo block and redraw even if a merge or material step raised
+        doc.EndUndo()
         c4d.EventAdd()
 
 if __name__ == "__main__":